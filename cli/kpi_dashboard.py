@@ -4,7 +4,6 @@ KPI Dashboard - Command line interface for monitoring RAG system performance.
 """
 
 import sys
-import os
 import argparse
 from pathlib import Path
 from datetime import datetime
@@ -7,13 +7,12 @@ A simple command-line interface for the RAG system.
 
 import sys
 from pathlib import Path
-from typing import Optional
 from langchain_core.messages import HumanMessage
 
 # Add the project root to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from rag_2_0.agents.rag_agent import create_rag_graph
+from rag_2_0.agents.rag_agent import graph
 
 def run_rag_query(query: str) -> None:
     """Run a single RAG query and display results."""
@@ -21,7 +20,6 @@ def run_rag_query(query: str) -> None:
     print("-" * 50)
     
     try:
-        graph = create_rag_graph()
         result = graph.invoke({
             "messages": [HumanMessage(content=query)]
         })
@@ -77,8 +75,6 @@ def interactive_mode() -> None:
     print("Type 'quit' or 'exit' to stop")
     print("=" * 50)
     
-    graph = create_rag_graph()
-    
     while True:
         try:
             query = input("\nEnter your query: ").strip()
@@ -3,9 +3,11 @@ Simple RAG Agent for LangGraph Studio.
 """
 
 from typing import TypedDict, List, Annotated, Literal
+import functools
 import operator
 import os
 import logging
+import re
 import sys
 
 from langchain_core.messages import BaseMessage, HumanMessage
@@ -66,6 +68,12 @@ vector_store = Chroma(
     persist_directory=persist_dir
 )
 
+# Leader names that select a tone profile, in detection priority order
+LEADER_NAME_PATTERNS = {
+    "janelle": re.compile(r"\bjanelle\b", re.IGNORECASE),
+    "doreen": re.compile(r"\bdoreen\b", re.IGNORECASE),
+}
+
 GRADE_PROMPT = """You are an expert content evaluator assessing document relevance with precision.
 
 DOCUMENT CONTENT:
@@ -143,8 +151,16 @@ def detect_social_media_request(state: RAGState) -> RAGState:
     logger.info(f"Social media detection: query='{query}', detected={is_social_media}")
     return {"is_social_media": is_social_media}
 
+def find_leader_name(text: str) -> str:
+    """Return the leader named explicitly in the text, or "" if none is."""
+    return next(
+        (name for name, pattern in LEADER_NAME_PATTERNS.items() if pattern.search(text)),
+        ""
+    )
+
+@functools.lru_cache(maxsize=16)
 def load_tone_profile(leader_name: str) -> str:
-    """Load tone profile from markdown file."""
+    """Load tone profile from markdown file (cached; restart to pick up edits)."""
     from pathlib import Path
 
     # Get the directory where this file is located
@@ -483,9 +499,6 @@ def retrieve_documents(state: RAGState) -> RAGState:
 
     # Get feedback storage for document scoring enhancement
     try:
-        import sys
-        import os
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
         from rag_2_0.feedback.feedback_storage import FeedbackStorage
         feedback_storage = FeedbackStorage()
     except ImportError:
@@ -507,9 +520,11 @@ def retrieve_documents(state: RAGState) -> RAGState:
     
     # If we have key topics and initial results are limited, do targeted search
     if key_topics and len(results) < top_k:
-        for topic in key_topics:
-            topic_results = vector_store.similarity_search(topic, k=top_k//2)
-            seen_content = {doc.page_content for doc in results}
+        # Embed all topics in a single request instead of one per search
+        topic_vectors = embeddings.embed_documents(key_topics)
+        seen_content = {doc.page_content for doc in results}
+        for topic_vector in topic_vectors:
+            topic_results = vector_store.similarity_search_by_vector(topic_vector, k=top_k//2)
             for doc in topic_results:
                 if doc.page_content not in seen_content and len(results) < top_k:
                     results.append(doc)
@@ -631,13 +646,6 @@ def generate_response(state: RAGState) -> RAGState:
 
     # Only use context if it was graded as relevant
     if grade == "yes":
-        # Import and use the improved source formatter
-        from rag_2_0.utils.source_formatter import SourceFormatter
-        formatter = SourceFormatter()
-        
-        # Use the retrieved docs metadata for better formatting
-        # sources_text = formatter.format_sources_section(retrieved_docs_metadata)  # Unused variable
-
         # Analyze query complexity to determine response approach
         is_analytical = any(word in query.lower() for word in ["analyze", "compare", "evaluate", "assess", "examples", "distinct"])
         is_actionable = any(word in query.lower() for word in ["how to", "steps", "implement", "strategy", "plan"])
@@ -750,9 +758,6 @@ Acknowledge the limitation authentically in your voice, explain what type of inf
 def register_response_for_feedback(state: RAGState) -> RAGState:
     """Register response with feedback collector for potential feedback collection."""
     try:
-        import sys
-        import os
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
         from rag_2_0.feedback.feedback_collector import FeedbackCollector
         from rag_2_0.feedback.feedback_storage import FeedbackStorage
 
@@ -882,7 +887,13 @@ def elicit_leader_and_tone(state: RAGState) -> RAGState:
 
     # First-time processing: try to detect leader in query
     logger.debug(f"First-time processing, detecting leader in query: '{query[:50]}...'")
-    detection_prompt = f"""Does this query mention a specific leader name? Look for "Janelle" or "Doreen" anywhere in the text.
+
+    # An exact name mention is settled without an LLM round-trip
+    detected_leader = find_leader_name(query)
+    response_content = detected_leader
+
+    if not detected_leader:
+        detection_prompt = f"""Does this query mention a specific leader name? Look for "Janelle" or "Doreen" anywhere in the text.
 
 Query: {query}
 
@@ -892,17 +903,16 @@ If neither name appears, respond with: none
 
 Only respond with one word: janelle, doreen, or none"""
 
-    detection_response = llm.invoke([HumanMessage(content=detection_prompt)])
-    response_content = detection_response.content.strip().lower()
+        detection_response = llm.invoke([HumanMessage(content=detection_prompt)])
+        response_content = detection_response.content.strip().lower()
 
-    logger.debug(f"Leader detection result: '{response_content}' for query: '{query[:50]}...'")
+        logger.debug(f"Leader detection result: '{response_content}' for query: '{query[:50]}...'")
 
-    # Extract leader name from response (handle various formats)
-    detected_leader = None
-    if "janelle" in response_content:
-        detected_leader = "janelle"
-    elif "doreen" in response_content:
-        detected_leader = "doreen"
+        # Extract leader name from response (handle various formats)
+        if "janelle" in response_content:
+            detected_leader = "janelle"
+        elif "doreen" in response_content:
+            detected_leader = "doreen"
 
     # If a leader was detected, proceed with that leader
     if detected_leader:
@@ -942,9 +952,6 @@ def collect_feedback(state: RAGState) -> RAGState:
     logger.debug("collect_feedback node called!")
 
     try:
-        import sys
-        import os
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
         # from rag_2_0.feedback.feedback_storage import FeedbackStorage  # Unused import
         from langchain_core.messages import AIMessage
 
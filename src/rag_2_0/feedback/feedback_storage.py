@@ -9,6 +9,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 import hashlib
 import logging
+import threading
+from contextlib import contextmanager
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -16,11 +18,26 @@ logger = logging.getLogger(__name__)
 class FeedbackStorage:
     def __init__(self, db_path: str = "feedback.db"):
         self.db_path = Path(db_path)
+        # Reuse one connection per instance instead of reconnecting per call.
+        # Slack Bolt dispatches handlers from a thread pool, so access is
+        # serialized with a lock.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
         self.init_database()
 
+    @contextmanager
+    def _connect(self):
+        """Yield the shared connection inside a transaction."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
     def init_database(self):
         """Initialize SQLite database with feedback tables."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS feedback (
                     id TEXT PRIMARY KEY,
@@ -78,7 +95,7 @@ class FeedbackStorage:
         feedback_id = str(uuid.uuid4())
         query_hash = self._hash_query(feedback_data.get('query', ''))
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("""
                 INSERT INTO feedback (
                     id, query_hash, query, response_id, satisfaction_score,
@@ -120,7 +137,7 @@ class FeedbackStorage:
                       response_time_ms: int = 0) -> bool:
         """Store response data for later feedback collection."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.execute("""
                     INSERT OR REPLACE INTO responses (
                         response_id, query, response_content, retrieved_docs, 
@@ -142,7 +159,7 @@ class FeedbackStorage:
     def get_response(self, response_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve stored response data."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.execute("""
                     SELECT query, response_content, retrieved_docs, persona, response_time_ms
                     FROM responses WHERE response_id = ?
@@ -168,7 +185,7 @@ class FeedbackStorage:
             return {}
 
         placeholders = ','.join(['?' for _ in doc_ids])
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(f"""
                 SELECT doc_id, AVG(relevance_score) as avg_score, COUNT(*) as count
                 FROM document_feedback 
@@ -183,7 +200,7 @@ class FeedbackStorage:
         """Get average satisfaction for similar queries - fast local lookup."""
         query_hash = self._hash_query(query)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT avg_satisfaction FROM query_patterns 
                 WHERE query_hash = ? AND feedback_count >= 3
@@ -194,7 +211,7 @@ class FeedbackStorage:
 
     def get_feedback_stats(self) -> Dict[str, Any]:
         """Get basic feedback statistics for monitoring."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT 
                     COUNT(*) as total_feedback,
@@ -215,7 +232,7 @@ class FeedbackStorage:
 
     def get_low_performing_docs(self, threshold: float = 2.0) -> List[Dict[str, Any]]:
         """Identify documents with consistently low relevance scores."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT doc_id, doc_title, AVG(relevance_score) as avg_score, COUNT(*) as feedback_count
                 FROM document_feedback
@@ -241,7 +258,8 @@ class FeedbackStorage:
 
     def _update_query_patterns(self, conn, query_hash: str, query: str, satisfaction_score: Optional[int]):
         """Update query pattern statistics."""
-        if satisfaction_score is None:
+        # Without a query every rating would pile onto the hash of ""
+        if satisfaction_score is None or not query.strip():
             return
 
         conn.execute("""
@@ -255,7 +273,7 @@ class FeedbackStorage:
 
     def export_feedback_batch(self, days: int = 7) -> List[Dict[str, Any]]:
         """Export recent feedback for batch analysis (cost-efficient)."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT query, satisfaction_score, relevance_score, feedback_text, persona
                 FROM feedback 
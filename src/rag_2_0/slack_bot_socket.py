@@ -4,11 +4,16 @@ Uses WebSocket connection - no public URL needed!
 """
 
 import os
+import re
 import sys
 import logging
+import random
+import threading
+import time
 from dotenv import load_dotenv
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
+from slack_sdk.errors import SlackApiError
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,18 +21,25 @@ load_dotenv()
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from rag_2_0.agents.rag_agent import create_rag_graph
+from rag_2_0.agents.rag_agent import embeddings, find_leader_name, graph as rag_graph
+from rag_2_0.feedback.feedback_storage import FeedbackStorage
+from rag_2_0.utils.response_cache import SemanticResponseCache
 from langchain_core.messages import HumanMessage
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (LOG_LEVEL=WARNING in production skips the per-event detail).
+# rag_agent has already installed the root handlers; only the level is set here.
+requested_level = os.getenv("LOG_LEVEL", "INFO").upper()
+log_level = requested_level if requested_level in logging.getLevelNamesMapping() else "INFO"
+logging.getLogger().setLevel(log_level)
 logger = logging.getLogger(__name__)
+if log_level != requested_level:
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", requested_level)
 
 # Debug: Log token info (first 20 chars only for security)
 bot_token = os.getenv("SLACK_BOT_TOKEN")
 signing_secret = os.getenv("SLACK_SIGNING_SECRET")
-logger.info(f"Loading SLACK_BOT_TOKEN: {bot_token[:20] if bot_token else 'NOT_SET'}...")
-logger.info(f"Loading SLACK_SIGNING_SECRET: {signing_secret[:20] if signing_secret else 'NOT_SET'}...")
+logger.info("Loading SLACK_BOT_TOKEN: %s...", bot_token[:20] if bot_token else 'NOT_SET')
+logger.info("Loading SLACK_SIGNING_SECRET: %s...", signing_secret[:20] if signing_secret else 'NOT_SET')
 
 # Initialize Slack app with Socket Mode
 app = App(
@@ -35,19 +47,203 @@ app = App(
     signing_secret=signing_secret
 )
 
-# Initialize RAG system
-rag_graph = create_rag_graph()
+# Shared feedback store, reused across rating clicks
+FEEDBACK_STORAGE = FeedbackStorage()
+
+# Persistent semantic cache for standalone questions (survives restarts).
+# A broken cache file or bad setting turns caching off instead of stopping the bot.
+try:
+    RESPONSE_CACHE = SemanticResponseCache(
+        embed_fn=embeddings.embed_query,
+        db_path=os.getenv("RESPONSE_CACHE_PATH", "response_cache.db"),
+        threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", 0.95)),
+        max_age=int(os.getenv("RESPONSE_CACHE_MAX_AGE", 7 * 24 * 3600)),
+        max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000)),
+        model=embeddings.model
+    )
+except Exception as e:
+    logger.error(f"Response cache disabled: {e}")
+    RESPONSE_CACHE = None
 
 # Get bot user ID for feedback validation
 BOT_USER_ID = None
 
+# Checkmark-style reactions that trigger a feedback prompt
+FEEDBACK_REACTIONS = frozenset({
+    "white_check_mark", "heavy_check_mark", "check", "checkmark",
+    "+1", "thumbsup", "thumbs_up", "ballot_box_with_check",
+    "white-check-mark", "heavy-check-mark", "check-mark",
+    "tick", "approved", "done", "yes"
+})
+
+# User mentions such as <@U123ABC> or <@U123ABC|name>
+_MENTION_RE = re.compile(r'<@[UW][A-Z0-9]+(?:\|[^>]+)?>')
+
+# Common events that the catch-all debug handler doesn't log
+QUIET_DEBUG_EVENTS = frozenset({"app_mention", "message"})
+
+# Static message payloads, built once at import
+GREETING_TEXT = """👋 Hi there! I'm your Wells Leadership Research assistant.\n\nI can help you explore insights from our extensive collection of leadership research papers. Just ask me questions like:\n\n• \"What makes an effective leader?\"\n• \"How do leaders build trust?\"  \n• \"What are the key leadership competencies?\"\n• \"Tell me about transformational leadership\"\n\nWhat would you like to know about leadership? 🚀"""
+
+DEBUG_INFO_TEMPLATE = """🔧 **Bot Debug Info**
+• Bot User ID: {user_id}
+• Bot Name: {user}
+• Team: {team}
+• App ID: {app_id}
+
+📋 **Testing Permissions:**
+• Can read messages: ✅ (you're seeing this)
+• Can write messages: ✅ (you're seeing this)
+
+🧪 **Reaction Test:**
+Try adding a ✅ checkmark reaction to this message to test feedback system!
+
+⚠️ **If reactions don't work, the Slack app needs:**
+• `reactions:read` scope
+• `reactions:write` scope  
+• `reaction_added` event subscription
+
+Current log will show if reaction events are received."""
+
+# Feedback prompt with interactive rating buttons
+FEEDBACK_BLOCKS = [
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "✨ *Thanks for the feedback!* How would you rate this response?"
+        }
+    },
+    {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "1 ⭐"},
+                "value": "1",
+                "action_id": "feedback_rating_1"
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "2 ⭐⭐"},
+                "value": "2",
+                "action_id": "feedback_rating_2"
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "3 ⭐⭐⭐"},
+                "value": "3",
+                "action_id": "feedback_rating_3"
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "4 ⭐⭐⭐⭐"},
+                "value": "4",
+                "action_id": "feedback_rating_4"
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "5 ⭐⭐⭐⭐⭐"},
+                "value": "5",
+                "action_id": "feedback_rating_5"
+            }
+        ]
+    },
+    {
+        "type": "input",
+        "element": {
+            "type": "plain_text_input",
+            "multiline": True,
+            "placeholder": {
+                "type": "plain_text",
+                "text": "Optional: Share specific feedback or suggestions..."
+            },
+            "action_id": "feedback_text"
+        },
+        "label": {
+            "type": "plain_text",
+            "text": "Additional Comments"
+        },
+        "optional": True
+    }
+]
+
+class TokenBucket:
+    """Thread-safe token bucket for client-side rate limiting"""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = rate_per_minute
+        self.tokens = float(rate_per_minute)
+        self.fill_rate = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+# reactions.* methods are rate limited per workspace at roughly 50 requests/minute
+REACTIONS_LIMITER = TokenBucket(50)
+
+def slack_call(fn, *args, retries: int = 3, **kwargs):
+    """Call a Slack Web API method, retrying HTTP 429 responses after Retry-After"""
+    name = getattr(fn, "__name__", type(fn).__name__)
+    for attempt in range(retries + 1):
+        if name.startswith("reactions_"):
+            REACTIONS_LIMITER.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except SlackApiError as e:
+            if e.response.status_code != 429 or attempt == retries:
+                raise
+            delay = int(e.response.headers.get("Retry-After", "1")) + random.random()
+            logger.warning(f"Slack rate limited {name}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            time.sleep(delay)
+
+# Queries answered faster than this never show the 👀 processing reaction
+EYES_REACTION_DELAY = 0.4
+
+def schedule_eyes_reaction(client, channel, ts):
+    """Add the 👀 reaction only if processing outlasts EYES_REACTION_DELAY.
+    
+    Returns the timer (cancel it once the answer is ready) and an event that
+    is set if the reaction was actually added.
+    """
+    added = threading.Event()
+    
+    def add_reaction():
+        try:
+            slack_call(client.reactions_add,
+                channel=channel,
+                timestamp=ts,
+                name="eyes"
+            )
+            added.set()
+            logger.info("👀 Added eyes reaction")
+        except Exception as e:
+            logger.warning(f"Could not add reaction: {e}")
+    
+    timer = threading.Timer(EYES_REACTION_DELAY, add_reaction)
+    timer.daemon = True
+    timer.start()
+    return timer, added
+
 def validate_and_fix_channel_context(client, event):
     """Validate channel access and attempt to refresh context if needed"""
     channel = event.get("channel")
     
     # First, try a simple API call to test channel access
     try:
-        client.conversations_info(channel=channel)
+        slack_call(client.conversations_info, channel=channel)
         return True, channel  # Channel works fine
     except Exception as e:
         if "channel_not_found" in str(e):
@@ -67,7 +263,6 @@ def clean_response_for_slack(response: str) -> str:
     
     # Replace markdown bold with Slack-friendly formatting
     # Convert **text** to *text* (Slack's bold format)
-    import re
     response = re.sub(r'\*\*(.*?)\*\*', r'*\1*', response)
     
     # Clean up excessive line breaks
@@ -88,12 +283,13 @@ def clean_response_for_slack(response: str) -> str:
             sources_lines = [line.strip() for line in sources_content.split('•') if line.strip()]
             
             if sources_lines:
-                clean_sources = "\n\n> *Sources:*"
+                parts = ["\n\n> *Sources:*"]
                 for source in sources_lines[:3]:  # Limit to 3 sources
                     # Remove extra formatting and clean up
                     clean_source = source.replace('*', '').strip()
                     if clean_source:
-                        clean_sources += f"\n> • {clean_source}"
+                        parts.append(f"> • {clean_source}")
+                clean_sources = "\n".join(parts)
                 
                 # Replace the original sources section
                 response = re.sub(pattern, clean_sources, response, flags=re.DOTALL)
@@ -104,9 +300,25 @@ def clean_response_for_slack(response: str) -> str:
     
     return response
 
-def process_rag_query(query: str, user_id: str, user_name: str = "") -> str:
-    """Process a query through the RAG system"""
+def is_cacheable_result(result: dict, leader: str) -> bool:
+    """Only cache finished answers given in the voice the query named explicitly.
+
+    Answers whose voice came from the LLM fallback (or a voice prompt) can't be
+    keyed reliably, since a near-identical query could name a different leader.
+    """
+    return (bool(result.get("response_id"))
+            and not result.get("waiting_for_leader")
+            and result.get("detected_leader") == leader)
+
+def process_rag_query(query: str, user_id: str, user_name: str = "") -> tuple[str, bool]:
+    """Process a query through the RAG system, returning (response, from_cache)"""
     try:
+        leader = find_leader_name(query) if RESPONSE_CACHE else ""
+        if leader:
+            cached_response = RESPONSE_CACHE.get(query, leader)
+            if cached_response is not None:
+                return cached_response, True
+        
         # Create initial state
         initial_state = {
             "messages": [HumanMessage(content=query)]
@@ -153,15 +365,18 @@ def process_rag_query(query: str, user_id: str, user_name: str = "") -> str:
         # Clean up formatting for Slack presentation
         response = clean_response_for_slack(response)
         
+        if leader and is_cacheable_result(result, leader):
+            RESPONSE_CACHE.put(query, response, leader, result.get("sources", []))
+        
         # Log for analytics
-        logger.info(f"Query from {user_id} ({user_name}): '{query[:50]}...' -> Response length: {len(response)}")
-        logger.info(f"Sources included in response: {'Sources' in response}")
+        logger.info("Query from %s (%s): '%s...' -> Response length: %s", user_id, user_name, query[:50], len(response))
+        logger.info("Sources included in response: %s", 'Sources' in response)
         
-        return response
+        return response, False
         
     except Exception as e:
         logger.error(f"Error in RAG processing: {e}")
-        return "Sorry, I encountered an error processing your request. Please try again."
+        return "Sorry, I encountered an error processing your request. Please try again.", False
 
 @app.event("app_mention")
 def handle_mention(event, say, client, ack):
@@ -169,15 +384,15 @@ def handle_mention(event, say, client, ack):
     ack()
     
     # Log App ID information for debugging
-    logger.info(f"🔍 APP DEBUG - Event data: {event}")
+    logger.debug("🔍 APP DEBUG - Event data: %s", event)
     
     # FIRST: Validate channel access before doing anything
     can_access, validated_channel = validate_and_fix_channel_context(client, event)
     if not can_access:
-        logger.info(f"Skipping mention event due to session channel access issue")
+        logger.info("Skipping mention event due to session channel access issue")
         return
     
-    logger.info(f"🎯 App mention handler triggered!")
+    logger.info("🎯 App mention handler triggered!")
     
     user_message = event.get("text", "").strip()
     user = event.get("user")
@@ -185,42 +400,31 @@ def handle_mention(event, say, client, ack):
     ts = event.get("ts")
     thread_ts = event.get("thread_ts", ts)  # If not a reply, thread_ts is ts
     
-    logger.info(f"📝 Original message: '{user_message}'")
-    logger.info(f"👤 User: {user}")
+    logger.info("📝 Original message: '%s'", user_message)
+    logger.info("👤 User: %s", user)
     
     # Remove bot mention from message
-    user_message = " ".join([word for word in user_message.split() if not word.startswith("<@")])
-    cleaned_message = user_message.strip()
+    cleaned_message = _MENTION_RE.sub('', user_message).strip()
     
-    logger.info(f"🧹 Cleaned message: '{cleaned_message}'")
+    logger.info("🧹 Cleaned message: '%s'", cleaned_message)
     
     if cleaned_message:
+        eyes_timer = None  # Scheduled right before the RAG call
         try:
-            # Add eyes reaction to show we're processing
-            try:
-                client.reactions_add(
-                    channel=channel,
-                    timestamp=ts,
-                    name="eyes"
-                )
-                logger.info("👀 Added eyes reaction")
-            except Exception as e:
-                logger.warning(f"Could not add reaction: {e}")
-
-            logger.info(f"Processing question from {user}: {cleaned_message[:50]}...")
+            logger.info("Processing question from %s: %s...", user, cleaned_message[:50])
 
             # --- NEW: Fetch thread history for context ---
             try:
                 thread_messages = []
                 if thread_ts:
                     # Fetch all messages in the thread
-                    replies = client.conversations_replies(
+                    replies = slack_call(client.conversations_replies,
                         channel=channel,
                         ts=thread_ts,
                         limit=50  # Slack's max is 100, but 50 is usually enough
                     )
                     thread_messages = replies.get("messages", [])
-                    logger.info(f"Fetched {len(thread_messages)} messages from thread for context.")
+                    logger.info("Fetched %s messages from thread for context.", len(thread_messages))
                 else:
                     # Not in a thread, just use the current message
                     thread_messages = [event]
@@ -233,7 +437,7 @@ def handle_mention(event, say, client, ack):
             message_history = []
             bot_user_id = None
             try:
-                auth_response = client.auth_test()
+                auth_response = slack_call(client.auth_test)
                 bot_user_id = auth_response["user_id"]
             except Exception as e:
                 logger.warning(f"Could not get bot user ID: {e}")
@@ -241,7 +445,7 @@ def handle_mention(event, say, client, ack):
             for msg in thread_messages:
                 text = msg.get("text", "").strip()
                 # Remove bot mention from each message
-                text = " ".join([word for word in text.split() if not word.startswith("<@")]).strip()
+                text = _MENTION_RE.sub('', text).strip()
                 if not text:
                     continue
                 if msg.get("user") == bot_user_id or msg.get("bot_id"):
@@ -260,6 +464,12 @@ def handle_mention(event, say, client, ack):
             # Pass full message history to RAG agent
             def process_rag_query_with_history(messages, user_id, user_name=""):
                 try:
+                    # Only standalone questions naming a leader are cached; thread context changes the answer
+                    leader = find_leader_name(cleaned_message) if RESPONSE_CACHE and len(messages) == 1 else ""
+                    if leader:
+                        cached_response = RESPONSE_CACHE.get(cleaned_message, leader)
+                        if cached_response is not None:
+                            return cached_response, True
                     initial_state = {"messages": messages}
                     result = rag_graph.invoke(initial_state)
                     response = ""
@@ -288,55 +498,69 @@ def handle_mention(event, say, client, ack):
                     if not response:
                         response = "I couldn't generate a response for your query."
                     response = clean_response_for_slack(response)
-                    logger.info(f"Query from {user_id} ({user_name}): '{cleaned_message[:50]}...' -> Response length: {len(response)}")
-                    logger.info(f"Sources included in response: {'Sources' in response}")
-                    return response
+                    if leader and is_cacheable_result(result, leader):
+                        RESPONSE_CACHE.put(cleaned_message, response, leader, result.get("sources", []))
+                    logger.info("Query from %s (%s): '%s...' -> Response length: %s", user_id, user_name, cleaned_message[:50], len(response))
+                    logger.info("Sources included in response: %s", 'Sources' in response)
+                    return response, False
                 except Exception as e:
                     logger.error(f"Error in RAG processing: {e}")
-                    return "Sorry, I encountered an error processing your request. Please try again."
+                    return "Sorry, I encountered an error processing your request. Please try again.", False
 
-            response = process_rag_query_with_history(message_history, user, "")
+            # Add eyes reaction to show we're processing, unless we answer first
+            eyes_timer, eyes_added = schedule_eyes_reaction(client, channel, ts)
+            response, from_cache = process_rag_query_with_history(message_history, user, "")
+            eyes_timer.cancel()
 
             # Reply in thread
-            say(
+            slack_call(say,
                 text=response,
                 thread_ts=thread_ts  # Always reply in thread
             )
+            # Join only after replying, so a rate-limited reactions_add can't delay the answer
+            eyes_timer.join()
             # Remove eyes reaction
-            try:
-                client.reactions_remove(
-                    channel=channel,
-                    timestamp=ts,
-                    name="eyes"
-                )
-                logger.info("👀 Removed eyes reaction - ready for user feedback")
-            except Exception as e:
-                logger.warning(f"Could not remove reaction: {e}")
+            if eyes_added.is_set():
+                try:
+                    slack_call(client.reactions_remove,
+                        channel=channel,
+                        timestamp=ts,
+                        name="eyes"
+                    )
+                    logger.info("👀 Removed eyes reaction - ready for user feedback")
+                except Exception as e:
+                    logger.warning(f"Could not remove reaction: {e}")
+            else:
+                logger.info("Answered before eyes reaction was needed (from_cache=%s)", from_cache)
         except Exception as e:
             logger.error(f"Error processing mention: {e}")
+            if eyes_timer:
+                eyes_timer.cancel()
+            slack_call(say,
+                channel=channel,
+                text="Sorry, I encountered an error processing your request. Please try again.",
+                thread_ts=thread_ts
+            )
             try:
-                client.reactions_remove(
-                    channel=channel,
-                    timestamp=ts,
-                    name="eyes"
-                )
-                client.reactions_add(
+                if eyes_timer:
+                    eyes_timer.join()
+                    if eyes_added.is_set():
+                        slack_call(client.reactions_remove,
+                            channel=channel,
+                            timestamp=ts,
+                            name="eyes"
+                        )
+                slack_call(client.reactions_add,
                     channel=channel,
                     timestamp=ts,
                     name="x"
                 )
             except:
                 pass
-            say(
-                channel=channel,
-                text="Sorry, I encountered an error processing your request. Please try again.",
-                thread_ts=thread_ts
-            )
     else:
-        logger.info(f"User {user} mentioned bot without question - sending greeting")
-        greeting = """👋 Hi there! I'm your Wells Leadership Research assistant.\n\nI can help you explore insights from our extensive collection of leadership research papers. Just ask me questions like:\n\n• \"What makes an effective leader?\"\n• \"How do leaders build trust?\"  \n• \"What are the key leadership competencies?\"\n• \"Tell me about transformational leadership\"\n\nWhat would you like to know about leadership? 🚀"""
-        say(
-            text=greeting,
+        logger.info("User %s mentioned bot without question - sending greeting", user)
+        slack_call(say,
+            text=GREETING_TEXT,
             thread_ts=thread_ts
         )
 
@@ -353,27 +577,14 @@ def handle_wells_command(ack, command, respond):
     if user_query.lower() in ["debug", "test", "status"]:
         try:
             # Get bot info and scopes
-            auth_info = app.client.auth_test()
+            auth_info = slack_call(app.client.auth_test)
             
-            debug_info = f"""🔧 **Bot Debug Info**
-• Bot User ID: {auth_info.get('user_id', 'Unknown')}
-• Bot Name: {auth_info.get('user', 'Unknown')}
-• Team: {auth_info.get('team', 'Unknown')}
-• App ID: {auth_info.get('app_id', 'Unknown')}
-
-📋 **Testing Permissions:**
-• Can read messages: ✅ (you're seeing this)
-• Can write messages: ✅ (you're seeing this)
-
-🧪 **Reaction Test:**
-Try adding a ✅ checkmark reaction to this message to test feedback system!
-
-⚠️ **If reactions don't work, the Slack app needs:**
-• `reactions:read` scope
-• `reactions:write` scope  
-• `reaction_added` event subscription
-
-Current log will show if reaction events are received."""
+            debug_info = DEBUG_INFO_TEMPLATE.format(
+                user_id=auth_info.get('user_id', 'Unknown'),
+                user=auth_info.get('user', 'Unknown'),
+                team=auth_info.get('team', 'Unknown'),
+                app_id=auth_info.get('app_id', 'Unknown')
+            )
             
             respond({
                 "response_type": "in_channel",
@@ -414,7 +625,7 @@ If this doesn't work, check that the Slack app has:
 • `reaction_added` event subscription""",
                 "mrkdwn": True
             })
-            logger.info(f"📤 Sent feedback test message: {test_response}")
+            logger.info("📤 Sent feedback test message: %s", test_response)
             return
             
         except Exception as e:
@@ -433,8 +644,8 @@ If this doesn't work, check that the Slack app has:
         return
     
     try:
-        logger.info(f"Processing /wells command from {user_name}: {user_query[:50]}...")
-        response = process_rag_query(user_query, user_id, user_name)
+        logger.info("Processing /wells command from %s: %s...", user_name, user_query[:50])
+        response, _ = process_rag_query(user_query, user_id, user_name)
         
         respond({
             "response_type": "in_channel",
@@ -454,46 +665,33 @@ def handle_reaction_added(event, say, client, ack):
     """Handle when users react to bot messages"""
     ack()
     
+    # Ignore non-feedback reactions before doing any other work
+    reaction = event.get("reaction")
+    if reaction not in FEEDBACK_REACTIONS:
+        return
+    
     item = event.get("item", {})
     channel = item.get("channel")
     
     # Validate channel access first
     try:
-        client.conversations_info(channel=channel)
+        slack_call(client.conversations_info, channel=channel)
     except Exception as e:
         if "channel_not_found" in str(e):
-            logger.info(f"Skipping reaction event due to session channel access issue")
+            logger.info("Skipping reaction event due to session channel access issue")
             return
         raise e
     
-    logger.info(f"🔄 REACTION EVENT RECEIVED!")
-    logger.info(f"🔍 Full event data: {event}")
+    logger.info("🔄 REACTION EVENT RECEIVED!")
+    logger.debug("🔍 Full event data: %s", event)
     
-    # Log ALL reaction details for debugging
-    reaction = event.get("reaction")
+    # Log reaction details for debugging
     user = event.get("user")
-    logger.info(f"👤 User: {user}")
-    logger.info(f"😀 Reaction emoji name: '{reaction}'")
-    logger.info(f"📧 Channel: {channel}")
-    logger.info(f"⏰ Message TS: {item.get('ts')}")
-    
-    # ENHANCED: Log every single reaction we receive to identify the correct name
-    logger.info(f"🧪 TESTING: Is '{reaction}' a checkmark reaction?")
-    
-    # Expanded list of possible checkmark reaction names
-    valid_reactions = [
-        "white_check_mark", "heavy_check_mark", "check", "checkmark", 
-        "+1", "thumbsup", "thumbs_up", "ballot_box_with_check",
-        "white-check-mark", "heavy-check-mark", "check-mark",
-        "tick", "approved", "done", "yes"
-    ]
-    
-    if reaction in valid_reactions:
-        logger.info(f"✅ Processing feedback reaction: {reaction}")
-    else:
-        logger.info(f"⏭️ Ignoring reaction: {reaction} (not a feedback reaction)")
-        logger.info(f"🔍 Available valid reactions: {valid_reactions}")
-        # STILL CONTINUE to check if it's on a bot message for debugging - we want to see all reactions
+    logger.info("👤 User: %s", user)
+    logger.info("😀 Reaction emoji name: '%s'", reaction)
+    logger.info("📧 Channel: %s", channel)
+    logger.info("⏰ Message TS: %s", item.get('ts'))
+    logger.info("✅ Processing feedback reaction: %s", reaction)
         
     # Only respond to reactions on bot messages
     user_id = event.get("user")
@@ -509,12 +707,12 @@ def handle_reaction_added(event, say, client, ack):
         # Get bot user ID if not cached
         global BOT_USER_ID
         if not BOT_USER_ID:
-            auth_response = client.auth_test()
+            auth_response = slack_call(client.auth_test)
             BOT_USER_ID = auth_response["user_id"]
-            logger.info(f"🤖 Bot user ID set to: {BOT_USER_ID}")
+            logger.info("🤖 Bot user ID set to: %s", BOT_USER_ID)
         
         # Get the original message to check if it's from the bot
-        response = client.conversations_history(
+        response = slack_call(client.conversations_history,
             channel=channel,
             latest=message_ts,
             limit=1,
@@ -530,25 +728,20 @@ def handle_reaction_added(event, say, client, ack):
         message_user = message.get("user")
         message_bot_id = message.get("bot_id")
         
-        logger.info(f"📧 Message details - User: {message_user}, Bot ID: {message_bot_id}, Our Bot ID: {BOT_USER_ID}")
+        logger.info("📧 Message details - User: %s, Bot ID: %s, Our Bot ID: %s", message_user, message_bot_id, BOT_USER_ID)
         
         # Check if the message is from our bot 
         is_bot_message = (message_user == BOT_USER_ID) or bool(message_bot_id)
         
         if not is_bot_message:
-            logger.info(f"🚫 Reaction not on bot message (message_user={message_user}, bot_id={message_bot_id})")
-            return
-            
-        # Only proceed if it's a valid feedback reaction
-        if reaction not in valid_reactions:
-            logger.info(f"🚫 Reaction '{reaction}' not in valid feedback reactions")
+            logger.info("🚫 Reaction not on bot message (message_user=%s, bot_id=%s)", message_user, message_bot_id)
             return
             
-        logger.info(f"📝 User {user_id} reacted with '{reaction}' to bot message, prompting for feedback")
+        logger.info("📝 User %s reacted with '%s' to bot message, prompting for feedback", user_id, reaction)
         
         # Check if we already prompted for feedback on this message
         try:
-            thread_messages = client.conversations_replies(
+            thread_messages = slack_call(client.conversations_replies,
                 channel=channel,
                 ts=message_ts,
                 limit=20  # Increased limit to catch more thread messages
@@ -571,81 +764,18 @@ def handle_reaction_added(event, say, client, ack):
             logger.warning(f"Could not check thread messages: {e}")
             # Continue anyway - better to potentially duplicate than miss feedback
         
-        # Create feedback prompt with interactive buttons
-        feedback_blocks = [
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"✨ *Thanks for the feedback!* How would you rate this response?"
-                }
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {"type": "plain_text", "text": "1 ⭐"},
-                        "value": "1",
-                        "action_id": "feedback_rating_1"
-                    },
-                    {
-                        "type": "button",
-                        "text": {"type": "plain_text", "text": "2 ⭐⭐"},
-                        "value": "2",
-                        "action_id": "feedback_rating_2"
-                    },
-                    {
-                        "type": "button",
-                        "text": {"type": "plain_text", "text": "3 ⭐⭐⭐"},
-                        "value": "3",
-                        "action_id": "feedback_rating_3"
-                    },
-                    {
-                        "type": "button",
-                        "text": {"type": "plain_text", "text": "4 ⭐⭐⭐⭐"},
-                        "value": "4",
-                        "action_id": "feedback_rating_4"
-                    },
-                    {
-                        "type": "button",
-                        "text": {"type": "plain_text", "text": "5 ⭐⭐⭐⭐⭐"},
-                        "value": "5",
-                        "action_id": "feedback_rating_5"
-                    }
-                ]
-            },
-            {
-                "type": "input",
-                "element": {
-                    "type": "plain_text_input",
-                    "multiline": True,
-                    "placeholder": {
-                        "type": "plain_text",
-                        "text": "Optional: Share specific feedback or suggestions..."
-                    },
-                    "action_id": "feedback_text"
-                },
-                "label": {
-                    "type": "plain_text",
-                    "text": "Additional Comments"
-                },
-                "optional": True
-            }
-        ]
-        
         # Send feedback prompt in thread
         try:
-            feedback_response = say(
+            feedback_response = slack_call(say,
                 text="Please rate this response:",
-                blocks=feedback_blocks,
+                blocks=FEEDBACK_BLOCKS,
                 thread_ts=message_ts
             )
-            logger.info(f"✅ Feedback prompt sent successfully: {feedback_response}")
+            logger.info("✅ Feedback prompt sent successfully: %s", feedback_response)
         except Exception as e:
             logger.error(f"❌ Failed to send feedback prompt: {e}")
             # Fallback to simple text message
-            say(
+            slack_call(say,
                 text=f"Thanks for the {reaction}! Please rate this response (1-5) and optionally provide feedback.",
                 thread_ts=message_ts
             )
@@ -655,11 +785,36 @@ def handle_reaction_added(event, say, client, ack):
         import traceback
         logger.error(f"Full traceback: {traceback.format_exc()}")
 
-@app.action("feedback_rating_1")
-@app.action("feedback_rating_2") 
-@app.action("feedback_rating_3")
-@app.action("feedback_rating_4")
-@app.action("feedback_rating_5")
+def find_rated_query(client, body) -> str:
+    """Return the question answered in the thread of a rating prompt, or "" if unknown.
+
+    The prompt is posted in the answer's thread; the question is the last
+    human message before it.
+    """
+    message = body.get("message", {})
+    channel = body.get("channel", {}).get("id")
+    thread_ts = message.get("thread_ts")
+    if not (channel and thread_ts):
+        return ""
+    try:
+        replies = slack_call(client.conversations_replies,
+            channel=channel,
+            ts=thread_ts,
+            limit=50
+        )
+    except Exception as e:
+        logger.warning(f"Could not fetch thread for rated query: {e}")
+        return ""
+
+    query = ""
+    for msg in replies.get("messages", []):
+        if msg.get("ts") == message.get("ts"):
+            break
+        if not msg.get("bot_id") and msg.get("user") != BOT_USER_ID:
+            query = _MENTION_RE.sub('', msg.get("text", "")).strip() or query
+    return query
+
+@app.action(re.compile(r"^feedback_rating_[1-5]$"))
 def handle_feedback_rating(ack, body, client, respond):
     """Handle feedback rating button clicks"""
     ack()
@@ -678,27 +833,19 @@ def handle_feedback_rating(ack, body, client, respond):
                 text_feedback = block_values["feedback_text"].get("value", "")
                 break
         
-        logger.info(f"📊 Received feedback: Rating={rating}, User={user_id}, Text='{text_feedback[:50]}...'")
+        logger.info("📊 Received feedback: Rating=%s, User=%s, Text='%s...'", rating, user_id, text_feedback[:50])
         
         # Store feedback in the system
         try:
-            import sys
-            import os
-            sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-            from rag_2_0.feedback.feedback_storage import FeedbackStorage
-            
-            storage = FeedbackStorage()
-            
             # Store the feedback in the database
-            feedback_id = storage.store_feedback(
-                response_id=f"slack_{user_id}_{body.get('action_ts', '')}",  # Simple correlation
-                rating=rating,
-                feedback_text=text_feedback or None,
-                user_id=user_id,
-                platform="slack"
-            )
+            feedback_id = FEEDBACK_STORAGE.store_feedback({
+                'response_id': f"slack_{user_id}_{body.get('action_ts', '')}",  # Simple correlation
+                'query': find_rated_query(client, body),
+                'satisfaction_score': rating,
+                'feedback_text': text_feedback or None,
+            })
             
-            logger.info(f"💾 Stored feedback with ID: {feedback_id}")
+            logger.info("💾 Stored feedback with ID: %s", feedback_id)
             
         except Exception as e:
             logger.error(f"Error storing feedback: {e}")
@@ -707,10 +854,11 @@ def handle_feedback_rating(ack, body, client, respond):
         star_display = "⭐" * rating
         
         # Create a clean, professional confirmation message
+        parts = ["✅ *Thank you for your feedback!*", "", f"🌟 *Rating:* {rating}/5 {star_display}"]
         if text_feedback:
-            response_text = f"✅ *Thank you for your feedback!*\n\n🌟 *Rating:* {rating}/5 {star_display}\n💬 *Comments:* {text_feedback}\n\n_Your feedback helps us improve our responses._"
-        else:
-            response_text = f"✅ *Thank you for your feedback!*\n\n🌟 *Rating:* {rating}/5 {star_display}\n\n_Your feedback helps us improve our responses._"
+            parts.append(f"💬 *Comments:* {text_feedback}")
+        parts.extend(["", "_Your feedback helps us improve our responses._"])
+        response_text = "\n".join(parts)
         
         # Replace the feedback prompt with confirmation
         respond({
@@ -737,12 +885,12 @@ def handle_feedback_rating(ack, body, client, respond):
 @app.event("message")
 def handle_message_events(event, say, client, logger):
     """Handle follow-up messages in threads where the bot has already replied."""
-    logger.info(f"📩 Message event received: {event}")
+    logger.debug("📩 Message event received: %s", event)
 
     # Validate channel access first
     can_access, validated_channel = validate_and_fix_channel_context(client, event)
     if not can_access:
-        logger.info(f"Skipping message event due to session channel access issue")
+        logger.info("Skipping message event due to session channel access issue")
         return
 
     # Only process if this is a thread reply (has thread_ts and it's not a bot message)
@@ -755,7 +903,7 @@ def handle_message_events(event, say, client, logger):
 
     # Ignore bot messages and message changes
     if subtype is not None:
-        logger.info(f"Ignoring message with subtype: {subtype}")
+        logger.info("Ignoring message with subtype: %s", subtype)
         return
     if not thread_ts or thread_ts == ts:
         # Not a thread reply
@@ -765,13 +913,13 @@ def handle_message_events(event, say, client, logger):
 
     # Fetch thread history
     try:
-        replies = client.conversations_replies(
+        replies = slack_call(client.conversations_replies,
             channel=channel,
             ts=thread_ts,
             limit=50
         )
         thread_messages = replies.get("messages", [])
-        logger.info(f"Fetched {len(thread_messages)} messages from thread for context.")
+        logger.info("Fetched %s messages from thread for context.", len(thread_messages))
     except Exception as e:
         logger.error(f"Error fetching thread history: {e}")
         return
@@ -779,7 +927,7 @@ def handle_message_events(event, say, client, logger):
     # Get bot user ID
     bot_user_id = None
     try:
-        auth_response = client.auth_test()
+        auth_response = slack_call(client.auth_test)
         bot_user_id = auth_response["user_id"]
     except Exception as e:
         logger.warning(f"Could not get bot user ID: {e}")
@@ -818,10 +966,10 @@ def handle_message_events(event, say, client, logger):
         should_respond = any(indicator in last_bot_message for indicator in prompt_indicators)
     
     if not should_respond:
-        logger.info(f"Last bot message was not asking for input. Ignoring follow-up message. Last bot message: '{last_bot_message[:100]}...'")
+        logger.info("Last bot message was not asking for input. Ignoring follow-up message. Last bot message: '%s...'", last_bot_message[:100])
         return
     else:
-        logger.info(f"Last bot message was asking for input. Processing follow-up: '{text[:50]}...'")
+        logger.info("Last bot message was asking for input. Processing follow-up: '%s...'", text[:50])
 
     # Build message history for RAG agent
     from langchain_core.messages import HumanMessage, AIMessage
@@ -829,7 +977,7 @@ def handle_message_events(event, say, client, logger):
     for msg in thread_messages:
         msg_text = msg.get("text", "").strip()
         # Remove bot mention from each message
-        msg_text = " ".join([word for word in msg_text.split() if not word.startswith("<@")]).strip()
+        msg_text = _MENTION_RE.sub('', msg_text).strip()
         if not msg_text:
             continue
         if msg.get("user") == bot_user_id or msg.get("bot_id"):
@@ -871,15 +1019,15 @@ def handle_message_events(event, say, client, logger):
             if not response:
                 response = "I couldn't generate a response for your query."
             response = clean_response_for_slack(response)
-            logger.info(f"Query from {user_id}: '{text[:50]}...' -> Response length: {len(response)}")
-            logger.info(f"Sources included in response: {'Sources' in response}")
+            logger.info("Query from %s: '%s...' -> Response length: %s", user_id, text[:50], len(response))
+            logger.info("Sources included in response: %s", 'Sources' in response)
             return response
         except Exception as e:
             logger.error(f"Error in RAG processing: {e}")
             return "Sorry, I encountered an error processing your request. Please try again."
 
     response = process_rag_query_with_history(message_history, user, "")
-    say(
+    slack_call(say,
         text=response,
         thread_ts=thread_ts
     )
@@ -888,20 +1036,20 @@ def handle_message_events(event, say, client, logger):
 @app.event({"type": "reaction_added"})
 def debug_reaction_added(body, logger):
     """Catch ALL reaction_added events for debugging"""
-    logger.info(f"🔍 RAW reaction_added event: {body}")
+    logger.debug("🔍 RAW reaction_added event: %s", body)
 
 @app.event({"type": "reaction_removed"})
 def debug_reaction_removed(body, logger):
     """Catch ALL reaction_removed events for debugging"""
-    logger.info(f"🔍 RAW reaction_removed event: {body}")
+    logger.debug("🔍 RAW reaction_removed event: %s", body)
 
 # Catch ALL events for debugging
 @app.event(".*")
 def debug_all_events(body, logger):
     """Catch ALL events to see what's being received"""
     event_type = body.get("event", {}).get("type", "unknown")
-    if event_type not in ["app_mention", "message"]:  # Don't spam common events
-        logger.info(f"🔍 DEBUG: {event_type} event: {body}")
+    if event_type not in QUIET_DEBUG_EVENTS:  # Don't spam common events
+        logger.debug("🔍 DEBUG: %s event: %s", event_type, body)
 
 # Add a specific handler to log ALL incoming webhooks
 @app.middleware
@@ -911,17 +1059,17 @@ def log_all_requests(body, next, logger):
     if event_type == "event_callback":
         inner_event = body.get("event", {})
         inner_type = inner_event.get("type", "unknown")
-        logger.info(f"🌐 Event callback received: {inner_type}")
+        logger.info("🌐 Event callback received: %s", inner_type)
         
         # Log App ID and Team ID for all events
         api_app_id = body.get("api_app_id", "UNKNOWN")
         team_id = body.get("team_id", "UNKNOWN")
-        logger.info(f"🆔 APP DEBUG - App ID: {api_app_id}, Team ID: {team_id}")
+        logger.info("🆔 APP DEBUG - App ID: %s, Team ID: %s", api_app_id, team_id)
         
         if inner_type == "reaction_added":
-            logger.info(f"🎯 REACTION EVENT DETECTED: {inner_event}")
+            logger.debug("🎯 REACTION EVENT DETECTED: %s", inner_event)
     else:
-        logger.info(f"🌐 Request type: {event_type}")
+        logger.info("🌐 Request type: %s", event_type)
     
     # Add session tracking for Socket Mode reconnections
     if event_type == "event_callback":
@@ -931,8 +1079,8 @@ def log_all_requests(body, next, logger):
             api_app_id = body.get("api_app_id", "UNKNOWN")
             team_id = body.get("team_id", "UNKNOWN")
             if channel:
-                logger.info(f"🔗 Processing event for channel: {channel}")
-                logger.info(f"🆔 App ID: {api_app_id}, Team ID: {team_id}")
+                logger.info("🔗 Processing event for channel: %s", channel)
+                logger.info("🆔 App ID: %s, Team ID: %s", api_app_id, team_id)
     
     next()
 
@@ -960,13 +1108,13 @@ if __name__ == "__main__":
         from slack_bolt import App
         test_client = app.client
         # Try to get bot info to verify connection
-        bot_info = test_client.auth_test()
-        logger.info(f"✅ Bot authenticated as: {bot_info.get('user', 'Unknown')}")
-        logger.info(f"✅ Bot user ID: {bot_info.get('user_id', 'Unknown')}")
+        bot_info = slack_call(test_client.auth_test)
+        logger.info("✅ Bot authenticated as: %s", bot_info.get('user', 'Unknown'))
+        logger.info("✅ Bot user ID: %s", bot_info.get('user_id', 'Unknown'))
         
         # Log current token scopes if available
         try:
-            auth_response = test_client.auth_test()
+            auth_response = slack_call(test_client.auth_test)
             if 'url' in auth_response:
                 logger.info("✅ Bot has web API access")
         except Exception as e:
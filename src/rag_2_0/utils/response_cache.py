@@ -0,0 +1,230 @@
+"""
+Persistent semantic response cache backed by SQLite.
+Similar questions are answered from disk instead of re-running the RAG graph.
+"""
+import functools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SemanticResponseCache:
+    """Cache responses keyed by query embedding, persisted across restarts.
+
+    Embeddings are kept in SQLite and mirrored in an in-memory matrix of unit
+    vectors; lookups are a single matrix-vector product. Entries are scoped by
+    leader voice, so a question is only answered from entries in the same
+    voice, and by embedding model: rows written with another model or vector
+    size are skipped. Rows older than max_age seconds are ignored and purged,
+    and the table is trimmed back below max_entries (least-hit, oldest first).
+
+    Rows added by other processes on the same host are picked up on the next
+    lookup. The database uses WAL mode, so it must live on a local disk, not a
+    network filesystem such as EFS or NFS.
+    """
+
+    def __init__(self, embed_fn: Callable[[str], List[float]],
+                 db_path: str = "response_cache.db", threshold: float = 0.95,
+                 max_age: int = 7 * 24 * 3600, max_entries: int = 5000,
+                 model: str = ""):
+        self.db_path = Path(db_path)
+        self.model = model
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._embed_fn = embed_fn
+        # get() and put() for the same query should only pay for one embedding call
+        self._embed = functools.lru_cache(maxsize=256)(self._embed_query)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Vector size of the current model; learned from stored rows or the first embedding
+        self._dim: Optional[int] = None
+        self.init_database()
+        with self._lock:
+            self._reset_index()
+            self._load_new_rows()
+        logger.info(f"Loaded {self._size} cached responses from {self.db_path}")
+
+    def init_database(self):
+        """Initialize SQLite database with the cache table."""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+            if columns and not {"leader", "model"} <= columns:
+                # Entries from older schemas have no recorded voice or embedding model
+                self._conn.execute("DROP TABLE cache")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,  -- never reused, so new rows are always id > max seen
+                    query TEXT NOT NULL,
+                    leader TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    emb BLOB NOT NULL,
+                    response TEXT NOT NULL,
+                    sources TEXT,
+                    ts INTEGER NOT NULL,
+                    hits INTEGER DEFAULT 0
+                )
+            """)
+
+    def _cutoff(self) -> int:
+        """Oldest timestamp that is still fresh."""
+        return int(time.time()) - self.max_age
+
+    def _reset_index(self):
+        """Drop the in-memory index; caller holds the lock."""
+        self._ids = np.empty(0, dtype=np.int64)
+        self._leaders = np.empty(0, dtype=object)
+        self._matrix = None
+        self._size = 0
+        self._max_id = 0
+
+    def _load_new_rows(self):
+        """Append fresh rows newer than the last one indexed; caller holds the lock.
+
+        Rows from another embedding model, or with a different vector size,
+        are skipped (they can't be compared with the current model's vectors).
+        """
+        rows = self._conn.execute(
+            "SELECT id, leader, emb FROM cache WHERE id > ? AND ts >= ? AND model = ? ORDER BY id",
+            (self._max_id, self._cutoff(), self.model)
+        ).fetchall()
+        if not rows:
+            return
+        # Move past every row read, including skipped ones, so they aren't re-read on each lookup
+        self._max_id = rows[-1][0]
+        if self._dim is None:
+            self._dim = len(rows[-1][2]) // 4
+        row_bytes = self._dim * 4
+        usable = [row for row in rows if len(row[2]) == row_bytes]
+        if len(usable) < len(rows):
+            logger.info(f"Skipped {len(rows) - len(usable)} cached responses with a different vector size")
+        rows = usable
+        if not rows:
+            return
+        vectors = np.vstack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+        needed = self._size + len(rows)
+        if self._matrix is None or needed > len(self._matrix):
+            # Grow geometrically so appends don't copy the whole matrix every time
+            capacity = max(needed, 2 * len(self._ids), 64)
+            matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            ids = np.empty(capacity, dtype=np.int64)
+            leaders = np.empty(capacity, dtype=object)
+            if self._size:
+                matrix[:self._size] = self._matrix[:self._size]
+                ids[:self._size] = self._ids[:self._size]
+                leaders[:self._size] = self._leaders[:self._size]
+            self._matrix, self._ids, self._leaders = matrix, ids, leaders
+        self._matrix[self._size:needed] = vectors
+        self._ids[self._size:needed] = [row[0] for row in rows]
+        self._leaders[self._size:needed] = [row[1] for row in rows]
+        self._size = needed
+
+    def _reload_index(self):
+        """Rebuild the index from the table after rows were removed; caller holds the lock."""
+        self._reset_index()
+        self._load_new_rows()
+
+    def _use_dim(self, dim: int):
+        """Switch the index to the current model's vector size; caller holds the lock."""
+        if dim != self._dim:
+            if self._dim is not None:
+                logger.warning(f"Embedding size changed from {self._dim} to {dim}; ignoring older cached responses")
+            self._dim = dim
+            self._reload_index()
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed and L2-normalize a query so dot products are cosine similarities."""
+        vec = np.asarray(self._embed_fn(query), dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, query: str, leader: str) -> Optional[str]:
+        """Return the cached response for a similar query in the same voice, or None on a miss."""
+        try:
+            vec = self._embed(query.strip().lower())
+            with self._lock:
+                self._use_dim(vec.size)
+                self._load_new_rows()
+                if not self._size:
+                    return None
+                scores = self._matrix[:self._size] @ vec
+                scores[self._leaders[:self._size] != leader] = -1.0
+                best = int(np.argmax(scores))
+                if scores[best] < self.threshold:
+                    return None
+                cache_id = int(self._ids[best])
+                with self._conn:
+                    self._conn.execute("UPDATE cache SET hits = hits + 1 WHERE id = ?", (cache_id,))
+                row = self._conn.execute(
+                    "SELECT response FROM cache WHERE id = ? AND ts >= ?", (cache_id, self._cutoff())
+                ).fetchone()
+                if row is None:
+                    # Expired, or evicted by another process
+                    self._reload_index()
+                    return None
+            logger.info(f"Response cache hit (similarity={scores[best]:.3f}, leader={leader}) for query: '{query[:50]}...'")
+            return row[0]
+        except Exception as e:
+            logger.error(f"Error reading response cache: {e}")
+            return None
+
+    def put(self, query: str, response: str, leader: str, sources: Optional[List[str]] = None) -> bool:
+        """Store a response for later lookups in the same voice."""
+        try:
+            vec = self._embed(query.strip().lower())
+            with self._lock:
+                self._use_dim(vec.size)
+                with self._conn:
+                    self._conn.execute("""
+                        INSERT INTO cache (query, leader, model, emb, response, sources, ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        query,
+                        leader,
+                        self.model,
+                        vec.tobytes(),
+                        response,
+                        json.dumps(sources or []),
+                        int(time.time())
+                    ))
+                if self._evict():
+                    self._reload_index()
+                else:
+                    self._load_new_rows()
+            return True
+        except Exception as e:
+            logger.error(f"Error storing cached response: {e}")
+            return False
+
+    def _evict(self) -> bool:
+        """Purge expired rows and trim the table to size; caller holds the lock.
+
+        Returns True if any row was removed.
+        """
+        with self._conn:
+            removed = self._conn.execute("DELETE FROM cache WHERE ts < ?", (self._cutoff(),)).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if count > self.max_entries:
+                # Trim to 90% so the next few puts don't each trigger a rebuild
+                removed += self._conn.execute("""
+                    DELETE FROM cache WHERE id IN (
+                        SELECT id FROM cache ORDER BY hits ASC, ts ASC LIMIT ?
+                    )
+                """, (count - int(self.max_entries * 0.9),)).rowcount
+        if removed:
+            logger.info(f"Evicted {removed} cached responses")
+        return removed > 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
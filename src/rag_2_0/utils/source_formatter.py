@@ -1,32 +1,71 @@
 """
 Source formatting utilities for clean, informative citations.
+
+The format_sources_* methods return "" for an empty metadata list, but callers
+on the response path are expected to check for retrieved documents first and
+skip the formatter entirely when there are none.
 """
 
+from collections import namedtuple
+from types import MappingProxyType
 from typing import List, Dict, Any
+import functools
+from operator import attrgetter
 import re
-from datetime import datetime
+
+# Journal abbreviations found in document titles
+_JOURNAL_PATTERNS = {
+    'JSM': 'Journal of Sport Management',
+    'JIS': 'Journal of Issues in Intercollegiate Athletics',
+    'JIAA': 'Journal of Issues in Intercollegiate Athletics',
+    'JIIA': 'Journal of Issues in Intercollegiate Athletics',
+    'SMR': 'Sport Management Review',
+    'JASM': 'Journal of Applied Sport Management',
+    'IJSM': 'International Journal of Sport Management',
+    'IJHMS': 'International Journal of Human Movement Science',
+    'RSJ': 'Recreational Sports Journal',
+    'JCD': 'Journal of Career Development',
+    'JSSAE': 'Journal of Student Services Administration and Evaluation',
+    'EM': 'Event Management',
+    'GI': 'Gender Issues',
+    'JSFD': 'Journal of Systemics, Cybernetics and Informatics'
+}
+
+# A formatted document citation
+Citation = namedtuple(
+    'Citation',
+    'display_title doc_type journal year authors size_info url category raw_title'
+)
+
+_BYTES_PER_MB = 1 << 20
+
+# Patterns used by extract_publication_info, compiled once at import
+_YEAR_RE = re.compile(r'20\d{2}')
+
+# Journal abbreviation delimited by dots (or at the start), longest alternatives first
+_JOURNAL_ALTERNATION = '|'.join(map(re.escape, sorted(_JOURNAL_PATTERNS, key=len, reverse=True)))
+_JOURNAL_RE = re.compile(r'(?:^|\.)(' + _JOURNAL_ALTERNATION + r')\.')
+
+# Title cleanup in one scan: trailing .pdf, leading year and dotted journal
+# abbreviations. A dot directly before a trailing .pdf is left for the .pdf
+# alternative, matching the order the separate substitutions used to run in.
+_NOT_PDF_SUFFIX = r'(?!(?i:pdf)$)'
+_CLEAN_RE = re.compile(
+    r'\.(?i:pdf)$'
+    r'|^20\d{2}\.' + _NOT_PDF_SUFFIX +
+    r'|\.(?:' + _JOURNAL_ALTERNATION + r')\.' + _NOT_PDF_SUFFIX
+)
+
+
+_citation_year = attrgetter('year')
 
 
 class SourceFormatter:
     """Format document sources into clean, informative citations."""
-    
-    def __init__(self):
-        self.journal_patterns = {
-            'JSM': 'Journal of Sport Management',
-            'JIS': 'Journal of Issues in Intercollegiate Athletics', 
-            'JIAA': 'Journal of Issues in Intercollegiate Athletics',
-            'JIIA': 'Journal of Issues in Intercollegiate Athletics',
-            'SMR': 'Sport Management Review',
-            'JASM': 'Journal of Applied Sport Management',
-            'IJSM': 'International Journal of Sport Management',
-            'IJHMS': 'International Journal of Human Movement Science',
-            'RSJ': 'Recreational Sports Journal',
-            'JCD': 'Journal of Career Development',
-            'JSSAE': 'Journal of Student Services Administration and Evaluation',
-            'EM': 'Event Management',
-            'GI': 'Gender Issues',
-            'JSFD': 'Journal of Systemics, Cybernetics and Informatics'
-        }
+
+    __slots__ = ()
+
+    journal_patterns = MappingProxyType(_JOURNAL_PATTERNS)
 
     def extract_publication_info(self, title: str) -> Dict[str, str]:
         """Extract publication information from document title."""
@@ -37,16 +76,15 @@ class SourceFormatter:
             'clean_title': title
         }
         
-        # Extract year (4 digits)
-        year_match = re.search(r'20\d{2}', title)
+        # Extract year (4 digits); most non-academic titles have no '20' at all
+        year_match = _YEAR_RE.search(title) if '20' in title else None
         if year_match:
             info['year'] = year_match.group()
         
         # Extract journal abbreviation and expand it
-        for abbrev, full_name in self.journal_patterns.items():
-            if f'.{abbrev}.' in title or title.startswith(f'{abbrev}.') or f'{abbrev}.' in title:
-                info['journal'] = full_name
-                break
+        journal_match = _JOURNAL_RE.search(title)
+        if journal_match:
+            info['journal'] = self.journal_patterns[journal_match.group(1)]
         
         # Extract authors (usually after year)
         if info['year']:
@@ -59,21 +97,21 @@ class SourceFormatter:
                     info['authors'] = author_part
         
         # Create clean title (remove file extensions, clean up)
-        clean_title = title
-        clean_title = re.sub(r'\.pdf$', '', clean_title, flags=re.IGNORECASE)
-        clean_title = re.sub(r'^20\d{2}\.', '', clean_title)  # Remove leading year
-        clean_title = re.sub(r'\.(JSM|JIS|JIAA|JIIA|SMR|JASM|IJSM|IJHMS|RSJ|JCD|JSSAE|EM|GI|JSFD)\.', '', clean_title)
-        info['clean_title'] = clean_title.strip(' .')
+        info['clean_title'] = _CLEAN_RE.sub('', title).strip(' .')
         
         return info
 
-    def format_document_citation(self, metadata: Dict[str, Any]) -> Dict[str, str]:
+    def format_document_citation(self, metadata: Dict[str, Any]) -> Citation:
         """Format a single document into a clean citation."""
-        title = metadata.get('title', metadata.get('source_file', 'Unknown Document'))
+        title = self._resolve_title(metadata)
         source_url = metadata.get('source', '')
         full_path = metadata.get('full_path', '')
         size = metadata.get('size', '')
         
+        return _format_citation_cached(title, source_url, full_path, size)
+
+    def _build_citation(self, title: str, source_url: str, full_path: str, size: Any) -> Citation:
+        """Build the citation for one document (uncached)."""
         # Extract publication info
         pub_info = self.extract_publication_info(title)
         
@@ -81,34 +119,39 @@ class SourceFormatter:
         doc_type = 'Research Paper'
         if 'Trade.Journals' in full_path:
             doc_type = 'Trade Publication'
-        elif any(j in title for j in self.journal_patterns.keys()):
+        elif pub_info['journal']:
             doc_type = 'Journal Article'
         elif '.pdf' in title.lower():
             doc_type = 'PDF Document'
         elif 'docs.google.com' in source_url:
             doc_type = 'Google Document'
         
-        # Format size
+        # Format size (metadata may hold it as str or int)
         size_str = ''
-        if size and size.isdigit():
-            size_mb = round(int(size) / 1048576, 1) if int(size) > 1048576 else None
-            if size_mb and size_mb > 0.1:
-                size_str = f" ({size_mb}MB)"
+        try:
+            size_bytes = int(size)
+        except (TypeError, ValueError):
+            size_bytes = 0
+        if size_bytes > _BYTES_PER_MB:
+            size_str = f" ({size_bytes / _BYTES_PER_MB:.1f}MB)"
         
         # Create formatted citation
-        citation = {
-            'display_title': pub_info['clean_title'] or title,
-            'doc_type': doc_type,
-            'journal': pub_info['journal'],
-            'year': pub_info['year'],
-            'authors': pub_info['authors'],
-            'size_info': size_str,
-            'url': source_url,
-            'category': self._get_category(full_path),
-            'raw_title': title
-        }
-        
-        return citation
+        return Citation(
+            display_title=pub_info['clean_title'] or title,
+            doc_type=doc_type,
+            journal=pub_info['journal'],
+            year=pub_info['year'],
+            authors=pub_info['authors'],
+            size_info=size_str,
+            url=source_url,
+            category=self._get_category(full_path),
+            raw_title=title
+        )
+
+    @staticmethod
+    def clear_citation_cache() -> None:
+        """Drop all memoized citations."""
+        _format_citation_cached.cache_clear()
 
     def _get_category(self, full_path: str) -> str:
         """Extract category from document path."""
@@ -119,60 +162,88 @@ class SourceFormatter:
         else:
             return 'Documents'
 
+    @staticmethod
+    def _resolve_title(metadata: Dict[str, Any]) -> str:
+        """Title shown for a document, falling back to its file name."""
+        return metadata.get('title') or metadata.get('source_file') or 'Unknown Document'
+
+    @staticmethod
+    def _unique_metadata(retrieved_docs_metadata: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Collapse chunks of the same document, keyed by (resolved title, source), keeping order."""
+        unique = {}
+        for doc_meta in retrieved_docs_metadata:
+            metadata = doc_meta.get('metadata', {})
+            key = (SourceFormatter._resolve_title(metadata), metadata.get('source'))
+            unique.setdefault(key, metadata)
+        return list(unique.values())
+
     def format_sources_section(self, retrieved_docs_metadata: List[Dict[str, Any]]) -> str:
         """Format multiple sources into a clean, organized section."""
         if not retrieved_docs_metadata:
             return ""
         
-        citations = []
-        seen_titles = set()
-        for doc_meta in retrieved_docs_metadata:
-            citation = self.format_document_citation(doc_meta.get('metadata', {}))
-            # Use raw_title as the key for deduplication
-            title_key = citation['raw_title']
-            if title_key not in seen_titles:
-                seen_titles.add(title_key)
-                citations.append(citation)
-        
-        # Group by category
-        categories = {}
-        for citation in citations:
-            category = citation['category']
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(citation)
+        unique = self._unique_metadata(retrieved_docs_metadata)
+        return self.format_sources_section_batch(
+            [self._resolve_title(m) for m in unique],
+            [m.get('source', '') for m in unique],
+            [m.get('full_path', '') for m in unique],
+            [m.get('size', '') for m in unique],
+        )
+
+    def format_sources_section_batch(self, titles: List[str], urls: List[str],
+                                     paths: List[str], sizes: List[Any]) -> str:
+        """Format a sources section from parallel columns, one entry per document.
+        
+        Columns are expected to be deduplicated already; format_sources_section
+        takes care of that for retrieved chunk metadata. Raises ValueError if
+        the columns differ in length.
+        """
+        lengths = {len(titles), len(urls), len(paths), len(sizes)}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"Source columns differ in length: titles={len(titles)}, urls={len(urls)}, "
+                f"paths={len(paths)}, sizes={len(sizes)}"
+            )
+        if not titles:
+            return ""
+        
+        # Format and group by category in a single pass
+        categories: Dict[str, List[Citation]] = {}
+        for citation in map(_format_citation_cached, titles, urls, paths, sizes):
+            categories.setdefault(citation.category, []).append(citation)
         
         # Build formatted output
         output_lines = ["\n\n**Sources:**"]
         
-        for category, docs in categories.items():
+        # Categories in name order; newest first within each (stable, so ties keep retrieval order)
+        for category in sorted(categories):
             if len(categories) > 1:  # Only show category headers if multiple categories
                 output_lines.append(f"\n**{category}:**")
             
-            for doc in docs:
+            for doc in sorted(categories[category], key=_citation_year, reverse=True):
                 # Create a clean, informative citation
-                citation_line = f"• **{doc['display_title']}**"
+                parts = ["• **", doc.display_title, "**"]
                 
                 # Add additional info
                 details = []
-                if doc['year']:
-                    details.append(doc['year'])
-                if doc['journal']:
-                    details.append(doc['journal'])
-                elif doc['doc_type'] != 'Research Paper':
-                    details.append(doc['doc_type'])
+                if doc.year:
+                    details.append(doc.year)
+                if doc.journal:
+                    details.append(doc.journal)
+                elif doc.doc_type != 'Research Paper':
+                    details.append(doc.doc_type)
                 
                 if details:
-                    citation_line += f" ({', '.join(details)})"
+                    parts.extend((" (", ", ".join(details), ")"))
                 
-                if doc['size_info']:
-                    citation_line += doc['size_info']
+                if doc.size_info:
+                    parts.append(doc.size_info)
                 
                 # Add link if available
-                if doc['url']:
-                    citation_line += f" [[View Document]({doc['url']})]"
+                if doc.url:
+                    parts.extend((" [[View Document](", doc.url, ")]"))
                 
-                output_lines.append(citation_line)
+                output_lines.append("".join(parts))
         
         return "\n".join(output_lines)
 
@@ -182,13 +253,13 @@ class SourceFormatter:
             return ""
         
         citations = []
-        for doc_meta in retrieved_docs_metadata:
-            citation = self.format_document_citation(doc_meta.get('metadata', {}))
+        for metadata in self._unique_metadata(retrieved_docs_metadata):
+            citation = self.format_document_citation(metadata)
             
             # Create compact citation
-            compact = citation['display_title']
-            if citation['year']:
-                compact += f" ({citation['year']})"
+            compact = citation.display_title
+            if citation.year:
+                compact += f" ({citation.year})"
             citations.append(compact)
         
         if len(citations) == 1:
@@ -198,12 +269,17 @@ class SourceFormatter:
 
     def format_inline_citations(self, retrieved_docs_metadata: List[Dict[str, Any]]) -> Dict[int, str]:
         """Create inline citation markers that can be embedded in text."""
-        citations = {}
-        for i, doc_meta in enumerate(retrieved_docs_metadata, 1):
-            citation = self.format_document_citation(doc_meta.get('metadata', {}))
-            short_cite = citation['display_title']
-            if citation['year']:
-                short_cite += f" ({citation['year']})"
-            citations[i] = short_cite
-        
-        return citations 
\ No newline at end of file
+        return {
+            i: f"{c.display_title} ({c.year})" if c.year else c.display_title
+            for i, doc_meta in enumerate(retrieved_docs_metadata, 1)
+            for c in (self.format_document_citation(doc_meta.get('metadata', {})),)
+        }
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_citation_cached(title: str, source_url: str, full_path: str, size: Any) -> Citation:
+    """Memoized citations, shared by all SourceFormatter instances."""
+    return _CITATION_FORMATTER._build_citation(title, source_url, full_path, size)
+
+
+_CITATION_FORMATTER = SourceFormatter()
@@ -0,0 +1,111 @@
+"""Tests for the persistent semantic response cache."""
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from rag_2_0.utils.response_cache import SemanticResponseCache
+
+
+def fake_embedder(dim=8):
+    """Deterministic embedder: the same text always maps to the same vector."""
+    def embed(text):
+        rng = np.random.default_rng(zlib.crc32(text.encode()))
+        return rng.standard_normal(dim).tolist()
+    return embed
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache" / "response_cache.db")
+
+
+def make_cache(db_path, dim=8, model="test-model", **kwargs):
+    return SemanticResponseCache(embed_fn=fake_embedder(dim), db_path=db_path,
+                                 model=model, **kwargs)
+
+
+def test_hit_in_same_voice(db_path):
+    cache = make_cache(db_path)
+    assert cache.put("How do I give feedback?", "Be specific.", leader="Alice")
+    assert cache.get("  how do I give FEEDBACK? ", leader="Alice") == "Be specific."
+
+
+def test_miss_in_other_voice(db_path):
+    cache = make_cache(db_path)
+    cache.put("How do I give feedback?", "Be specific.", leader="Alice")
+    assert cache.get("How do I give feedback?", leader="Bob") is None
+    assert cache.get("Something unrelated", leader="Alice") is None
+
+
+def test_second_instance_sees_new_rows(db_path):
+    first = make_cache(db_path)
+    second = make_cache(db_path)
+    first.put("What is our mission?", "To help.", leader="Alice")
+    assert second.get("What is our mission?", leader="Alice") == "To help."
+
+
+def test_entries_persist_across_restarts(db_path):
+    cache = make_cache(db_path)
+    cache.put("What is our mission?", "To help.", leader="Alice")
+    cache.close()
+    assert make_cache(db_path).get("What is our mission?", leader="Alice") == "To help."
+
+
+def test_expired_entries_are_ignored(db_path):
+    cache = make_cache(db_path, max_age=60)
+    cache.put("What is our mission?", "To help.", leader="Alice")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE cache SET ts = ?", (int(time.time()) - 120,))
+    assert cache.get("What is our mission?", leader="Alice") is None
+    assert make_cache(db_path, max_age=60)._size == 0
+
+
+def test_table_is_trimmed_to_max_entries(db_path):
+    cache = make_cache(db_path, max_entries=10)
+    cache.put("question 0", "answer 0", leader="Alice")
+    # A hit keeps the entry ahead of the never-hit ones when the table is trimmed
+    assert cache.get("question 0", leader="Alice") == "answer 0"
+    for i in range(1, 15):
+        cache.put(f"question {i}", f"answer {i}", leader="Alice")
+    with sqlite3.connect(db_path) as conn:
+        count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert count <= 10
+    assert cache._size == count
+    assert cache.get("question 0", leader="Alice") == "answer 0"
+
+
+def test_old_schema_is_dropped(db_path, tmp_path):
+    (tmp_path / "cache").mkdir()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE cache (id INTEGER PRIMARY KEY, query TEXT, emb BLOB, response TEXT, ts INTEGER)")
+        conn.execute("INSERT INTO cache (query, emb, response, ts) VALUES ('q', x'00', 'r', 0)")
+    cache = make_cache(db_path)
+    assert cache._size == 0
+    assert cache.put("What is our mission?", "To help.", leader="Alice")
+    assert cache.get("What is our mission?", leader="Alice") == "To help."
+
+
+def test_other_model_rows_are_skipped(db_path):
+    make_cache(db_path, model="old-model").put("What is our mission?", "To help.", leader="Alice")
+    cache = make_cache(db_path, model="new-model")
+    assert cache._size == 0
+    assert cache.get("What is our mission?", leader="Alice") is None
+
+
+def test_vector_size_change(db_path):
+    old = make_cache(db_path, dim=8)
+    assert old.put("What is our mission?", "eight", leader="Alice")
+
+    new = make_cache(db_path, dim=4)
+    assert new.put("What is our mission?", "four", leader="Alice")
+    assert new.get("What is our mission?", leader="Alice") == "four"
+    assert new.get("What is our mission?", leader="Alice") == "four"
+    # The instance still on the old size keeps serving its own rows
+    assert old.get("What is our mission?", leader="Alice") == "eight"
+
+    restarted = make_cache(db_path, dim=4)
+    assert restarted._size == 1
+    assert restarted.get("What is our mission?", leader="Alice") == "four"